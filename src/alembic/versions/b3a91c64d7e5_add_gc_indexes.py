@@ -0,0 +1,32 @@
+"""add gc indexes
+
+Revision ID: b3a91c64d7e5
+Revises: 6108f0084314
+Create Date: 2026-08-26 10:12:45.118204
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "b3a91c64d7e5"
+down_revision = "6108f0084314"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index(
+        "ix_messages_gc",
+        "messages",
+        ["chat_id", "deleted", "should_delete", "date"],
+    )
+    op.create_index(
+        "ix_messages_sweep",
+        "messages",
+        ["deleted", "should_delete", "delete_after"],
+    )
+
+
+def downgrade():
+    op.drop_index("ix_messages_sweep", "messages")
+    op.drop_index("ix_messages_gc", "messages")
@@ -0,0 +1,26 @@
+"""add chat date index
+
+Revision ID: d48e20c7a5f1
+Revises: f2c61a80d9ab
+Create Date: 2026-08-26 14:02:31.908547
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "d48e20c7a5f1"
+down_revision = "f2c61a80d9ab"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index(
+        "ix_messages_chat_date",
+        "messages",
+        ["chat_id", "date"],
+    )
+
+
+def downgrade():
+    op.drop_index("ix_messages_chat_date", "messages")
@@ -0,0 +1,28 @@
+"""unique settings chat_id
+
+Revision ID: e7d40b218f36
+Revises: b3a91c64d7e5
+Create Date: 2026-08-26 11:03:12.664871
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "e7d40b218f36"
+down_revision = "b3a91c64d7e5"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Drop duplicate rows (keeping the oldest one per chat) before adding
+    # the constraint.
+    op.execute(
+        "DELETE FROM settings a USING settings b "
+        "WHERE a.id > b.id AND a.chat_id = b.chat_id"
+    )
+    op.create_unique_constraint("uq_settings_chat_id", "settings", ["chat_id"])
+
+
+def downgrade():
+    op.drop_constraint("uq_settings_chat_id", "settings", type_="unique")
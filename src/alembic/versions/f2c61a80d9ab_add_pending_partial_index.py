@@ -0,0 +1,28 @@
+"""add pending partial index
+
+Revision ID: f2c61a80d9ab
+Revises: e7d40b218f36
+Create Date: 2026-08-26 13:21:54.730112
+
+"""
+from alembic import op
+from sqlalchemy import text
+
+# revision identifiers, used by Alembic.
+revision = "f2c61a80d9ab"
+down_revision = "e7d40b218f36"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index(
+        "ix_messages_pending",
+        "messages",
+        ["delete_after"],
+        postgresql_where=text("should_delete AND NOT deleted"),
+    )
+
+
+def downgrade():
+    op.drop_index("ix_messages_pending", "messages")
@@ -2,12 +2,16 @@ from __future__ import annotations
 
 import logging
 import os
-from typing import TYPE_CHECKING, Any
+import re
+from functools import lru_cache
+from queue import Full, Queue
+from threading import Thread
+from typing import TYPE_CHECKING, Any, Callable, Optional, Type
 
 import pytimeparse
 
 from bot_context import BotContext
-from command_handlers import CommandHandlerRegistry
+from command_handlers import CommandHandler, CommandHandlerRegistry
 from db import session
 from entities import CallbackQuery, Message
 from exceptions import ValidationError
@@ -21,22 +25,51 @@ if TYPE_CHECKING:
 
 logger = logging.getLogger(__name__)
 
-FORWARD_USERNAMES_TO_DELETE = [
-    "tutby_official",
-    "mediazona_by",
-]
+# Fast path for the overwhelmingly common single-unit tags ("5m", "1h").
+_TTL_RE = re.compile(r"(\d+)\s*([smhd])")
+_UNIT_SECONDS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+
+
+@lru_cache(maxsize=4096)
+def _parse_ttl(tag: str) -> Optional[float]:
+    match = _TTL_RE.fullmatch(tag)
+    if match:
+        return int(match.group(1)) * _UNIT_SECONDS[match.group(2)]
+
+    # pytimeparse re-runs a stack of Python regexes on every call, so it's
+    # kept only as the fallback for compound intervals like "1h30m".
+    return pytimeparse.parse(tag)
+
+
+FORWARD_USERNAMES_TO_DELETE = frozenset(
+    {
+        "tutby_official",
+        "mediazona_by",
+    }
+)
 
 
 class Bot:
     USERNAME = os.environ.get("BOT_USERNAME", "gcservantbot")
+    UPDATES_QUEUE_SIZE = 1000
 
     def __init__(self, client: Client, collector: GarbageCollector) -> None:
         self.client = client
         self.collector = collector
         self.context = BotContext()
+        self._updates: Queue[dict] = Queue(maxsize=self.UPDATES_QUEUE_SIZE)
+        self._worker = Thread(target=self._process_updates_loop, daemon=True)
+        self._handlers: dict[Type[CommandHandler], CommandHandler] = {}
+        # Maps the update's payload key to its parser and handler, so
+        # process_update does dict lookups instead of a chain of `in` checks.
+        self._update_dispatch: dict[str, tuple[Callable, Callable]] = {
+            "message": (Message.from_json, self.process_message),
+            "callback_query": (CallbackQuery.from_json, self.process_callback),
+        }
 
     def start(self) -> None:
         self.set_my_commands()
+        self._worker.start()
         self.run_polling_loop()
 
     def set_my_commands(self) -> None:
@@ -59,41 +92,68 @@ class Bot:
                 updates = self.client.get_updates()
             except KeyboardInterrupt:
                 logger.info("Exiting...")
+                self._updates.join()
                 return
 
+            # Hand updates over to the worker thread so the next getUpdates
+            # request isn't delayed by handler or database latency.
             for update in updates:
-                self.process_update(update)
+                try:
+                    self._updates.put_nowait(update)
+                except Full:
+                    logger.error("Updates queue is full, dropping update")
 
             if updates:
-                logger.debug("%d update(s) processed", len(updates))
+                logger.debug("%d update(s) enqueued", len(updates))
 
-    def process_update(self, update: dict) -> None:
-        logger.debug("Processing new update: %s", update)
+    def _process_updates_loop(self) -> None:
+        while True:
+            update = self._updates.get()
+            try:
+                self.process_update(update)
+            except Exception:
+                logger.exception("Failed to process update: %s", update)
+                # Reset the worker's session: after a DB error it is stuck
+                # in failed-transaction state and every later update would
+                # raise PendingRollbackError.
+                session.rollback()
+            finally:
+                self._updates.task_done()
 
-        if "message" in update:
-            message = Message.from_json(update["message"])
-            self.process_message(message)
-        elif "callback_query" in update:
-            callback = CallbackQuery.from_json(update["callback_query"])
-            self.process_callback(callback)
+    def process_update(self, update: dict) -> None:
+        # The dataclass reprs on Message/CallbackQuery are not free; skip
+        # them entirely unless DEBUG logging is on.
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Processing new update: %s", update)
+
+        for key, (parse, handle) in self._update_dispatch.items():
+            payload = update.get(key)
+            if payload is not None:
+                handle(parse(payload))
+                return
 
     def process_message(self, message: Message) -> None:
-        logger.debug("New %s", message)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("New %s", message)
 
+        # Most messages are plain text: cheap membership tests on the raw
+        # text avoid entity scanning and parsing for them entirely.
+        text = message.text
         if message.forward_from_chat:
             if self.process_forward_message(message):
                 return
-        elif message.command:
+        elif text and text.startswith("/") and message.command:
             if self.process_command_message(message):
                 return
-        elif tags := message.get_tags():
+        elif text and "#" in text and (tags := message.get_tags()):
             if self.process_tags(message, tags):
                 return
 
         self.collector.add_message(message)
 
     def process_callback(self, callback: CallbackQuery) -> None:
-        logger.debug("New %s", callback)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("New %s", callback)
 
         callback_type = callback.data.get("type")
         if callback_type is None:
@@ -102,8 +162,16 @@ class Bot:
 
         handler_class = CommandHandlerRegistry.get_for_callback_type(callback_type)
         if handler_class:
+            self._get_handler(handler_class).process_callback(callback)
+
+    def _get_handler(self, handler_class: Type[CommandHandler]) -> CommandHandler:
+        # Handlers hold no per-message state, so build each one once and
+        # reuse it instead of instantiating a handler for every update.
+        handler = self._handlers.get(handler_class)
+        if handler is None:
             handler = handler_class(self.client, self.collector, self.context)
-            handler.process_callback(callback)
+            self._handlers[handler_class] = handler
+        return handler
 
     def process_command_message(self, message: Message) -> bool:
         command = message.command
@@ -125,7 +193,7 @@ class Bot:
             self.client.reply(message, f"Unrecognized command: {command.command_str}")
             return False
 
-        handler = handler_class(self.client, self.collector, self.context)
+        handler = self._get_handler(handler_class)
         try:
             handler.validate(command)
         except ValidationError as exc:
@@ -152,7 +220,7 @@ class Bot:
         return True
 
     def process_tags(self, message: Message, tags: list[str]) -> bool:
-        ttl = pytimeparse.parse(tags[0])
+        ttl = _parse_ttl(tags[0])
         if ttl and valid_ttl(ttl):
             self.collector.add_message(message, int(ttl))
             return True
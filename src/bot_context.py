@@ -8,6 +8,8 @@ if TYPE_CHECKING:
 
 
 class BotContext:
+    __slots__ = ("start_at",)
+
     def __init__(self) -> None:
         self.start_at = datetime.now()
 
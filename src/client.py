@@ -1,12 +1,20 @@
 from __future__ import annotations
 
+import json
 import logging
 import os
 from dataclasses import dataclass, field
 from typing import TYPE_CHECKING, Any, cast
 
 import requests
+from requests.adapters import HTTPAdapter
 from requests.exceptions import Timeout
+from urllib3.util.retry import Retry
+
+try:
+    import orjson
+except ImportError:
+    orjson = None  # type: ignore[assignment]
 
 if TYPE_CHECKING:
     from requests import Response
@@ -15,9 +23,38 @@ if TYPE_CHECKING:
 
 logger = logging.getLogger(__name__)
 
+
+def _json_loads(raw: bytes) -> Any:
+    # orjson parses large getUpdates payloads several times faster than the
+    # stdlib, but remains an optional speedup.
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+def _json_dumps(data: dict) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(data)
+    return json.dumps(data).encode()
+
+
 TOKEN = os.environ["TOKEN"]
 BASE_URL = f"https://api.telegram.org/bot{TOKEN}"
 
+# One connection pool for the whole process: the polling thread, the
+# collector thread and its delete workers all multiplex over the same warm
+# TLS connections. Retries only apply to idempotent methods (so getUpdates,
+# not sendMessage), which keeps 429/5xx blips from tearing the loop down.
+_ADAPTER = HTTPAdapter(
+    pool_connections=2,
+    pool_maxsize=16,
+    max_retries=Retry(
+        total=2,
+        backoff_factor=0.2,
+        status_forcelist=[429, 500, 502, 503, 504],
+    ),
+)
+
 
 @dataclass
 class APIResponse:
@@ -41,7 +78,7 @@ class APIResponse:
     @classmethod
     def from_response(cls, response: Response) -> APIResponse:
         try:
-            data = response.json()
+            data = _json_loads(response.content)
         except ValueError:
             data = {}
             logger.error("Invalid json in API response: %s", response.text)
@@ -65,20 +102,33 @@ class APIResponse:
 
 
 class Client:
-    POLL_INTERVAL = 60
+    POLL_INTERVAL = int(os.environ.get("POLL_INTERVAL", 60))
+    GET_UPDATES_URL = f"{BASE_URL}/getUpdates"
+    SEND_MESSAGE_URL = f"{BASE_URL}/sendMessage"
+    DELETE_MESSAGE_URL = f"{BASE_URL}/deleteMessage"
+    DELETE_MESSAGES_URL = f"{BASE_URL}/deleteMessages"
+    SEND_CHAT_ACTION_URL = f"{BASE_URL}/sendChatAction"
+    EDIT_MESSAGE_TEXT_URL = f"{BASE_URL}/editMessageText"
+    ANSWER_CALLBACK_QUERY_URL = f"{BASE_URL}/answerCallbackQuery"
+    SET_MY_COMMANDS_URL = f"{BASE_URL}/setMyCommands"
     DEFAULT_TIMEOUT = 5
+    # Caps the size of a single getUpdates payload. Lower it on
+    # memory-constrained deployments to bound per-poll allocations.
+    UPDATES_LIMIT = int(os.environ.get("UPDATES_LIMIT", 100))
+    # The bot only ever looks at these update types; filtering server-side
+    # keeps the getUpdates payloads small.
+    ALLOWED_UPDATES = ["message", "callback_query"]
 
     def __init__(self, last_update_id: int | None = None) -> None:
         self.last_update_id = last_update_id
-        self.headers = {"Content-Type": "application/json"}
+        # Re-use one session (and thus one TLS connection) for all API calls
+        # instead of paying for a new handshake on every request.
+        self.session = requests.Session()
+        self.session.headers.update({"Content-Type": "application/json"})
+        self.session.mount("https://", _ADAPTER)
 
     def _prepare_params(self, request_params: dict) -> dict:
-        headers = {}
-        headers.update(self.headers)
-        headers.update(request_params.pop("headers", {}))
-
         params = {
-            "headers": headers,
             "timeout": self.DEFAULT_TIMEOUT,
         }
         params.update(request_params)
@@ -89,13 +139,16 @@ class Client:
         params = self._prepare_params(request_params)
 
         try:
-            response = requests.post(url, json=data, **params)
+            response = self.session.post(url, data=_json_dumps(data), **params)
         except Timeout:
             return APIResponse.from_timeout()
 
-        api_response = APIResponse.from_response(response)
-        logger.debug("POST response: %s", api_response)
-        return api_response
+        # Log only the response size: stringifying the APIResponse decodes
+        # and formats the whole body even when the record is dropped later.
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("POST %s -> %d bytes", url, len(response.content))
+
+        return APIResponse.from_response(response)
 
     def _get(
         self,
@@ -106,10 +159,13 @@ class Client:
         full_request_params = self._prepare_params(request_params)
 
         try:
-            response = requests.get(url, params=params, **full_request_params)
+            response = self.session.get(url, params=params, **full_request_params)
         except Timeout:
             return APIResponse.from_timeout()
 
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("GET %s -> %d bytes", url, len(response.content))
+
         return APIResponse.from_response(response)
 
     @property
@@ -118,10 +174,14 @@ class Client:
 
     def get_updates(self) -> list[dict]:
         response = self._get(
-            f"{BASE_URL}/getUpdates",
+            self.GET_UPDATES_URL,
             params={
                 "timeout": self.POLL_INTERVAL,
                 "offset": self.offset,
+                "limit": self.UPDATES_LIMIT,
+                # Telegram expects the list as a JSON-serialized string when
+                # passed in the query.
+                "allowed_updates": json.dumps(self.ALLOWED_UPDATES),
             },
             timeout=self.POLL_INTERVAL + 5,
         )
@@ -163,7 +223,7 @@ class Client:
         }
         body.update(extra_params)
 
-        return self._post(f"{BASE_URL}/sendMessage", body)
+        return self._post(self.SEND_MESSAGE_URL, body)
 
     def delete_message(self, chat_id: int, message_id: int) -> APIResponse:
         body = {
@@ -171,7 +231,16 @@ class Client:
             "message_id": message_id,
         }
 
-        return self._post(f"{BASE_URL}/deleteMessage", body)
+        return self._post(self.DELETE_MESSAGE_URL, body)
+
+    def delete_messages(self, chat_id: int, message_ids: list[int]) -> APIResponse:
+        # Bot API deleteMessages accepts up to 100 ids from the same chat.
+        body = {
+            "chat_id": chat_id,
+            "message_ids": message_ids,
+        }
+
+        return self._post(self.DELETE_MESSAGES_URL, body)
 
     def send_chat_action(self, chat_id: int, action: str) -> APIResponse:
         body = {
@@ -179,7 +248,7 @@ class Client:
             "action": action,
         }
 
-        return self._post(f"{BASE_URL}/sendChatAction", body)
+        return self._post(self.SEND_CHAT_ACTION_URL, body)
 
     def edit_message_text(
         self,
@@ -195,7 +264,7 @@ class Client:
         }
         body.update(extra_params)
 
-        return self._post(f"{BASE_URL}/editMessageText", body)
+        return self._post(self.EDIT_MESSAGE_TEXT_URL, body)
 
     def answer_callback_query(
         self,
@@ -207,7 +276,7 @@ class Client:
         }
         body.update(extra_params)
 
-        return self._post(f"{BASE_URL}/answerCallbackQuery", body)
+        return self._post(self.ANSWER_CALLBACK_QUERY_URL, body)
 
     def set_my_commands(self, commands: list[dict[str, str]]) -> APIResponse:
-        return self._post(f"{BASE_URL}/setMyCommands", {"commands": commands})
+        return self._post(self.SET_MY_COMMANDS_URL, {"commands": commands})
@@ -2,22 +2,25 @@ from __future__ import annotations
 
 import logging
 import time
-from datetime import datetime, timedelta
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from functools import wraps
 from queue import Empty, Queue
-from threading import Thread
+from threading import Event, Lock, Thread
 from typing import TYPE_CHECKING, Any, Callable, TypeVar, cast
 
+from sqlalchemy import and_, case, func
+
 from db import MessageRecord, Session
 from db import session as global_session
-from settings import get_settings
+from settings import get_settings, invalidate_settings
 from utils.formatting import format_interval
 
 if TYPE_CHECKING:
     from sqlalchemy.orm import Query
     from sqlalchemy.orm.session import Session as SessionType
 
-    from client import Client
+    from client import APIResponse, Client
     from entities import Message
 
 logger = logging.getLogger(__name__)
@@ -25,17 +28,21 @@ logger = logging.getLogger(__name__)
 F = TypeVar("F", bound=Callable[..., Any])
 
 
+# Resolved once: logging.getLogger takes a lock and walks the logger dict,
+# and the decorated functions run on every collector wake-up.
+_sql_logger = logging.getLogger("sqlalchemy.engine")
+
+
 def no_sql_log(func: F) -> F:
     @wraps(func)
     def inner(*args, **kwargs):  # type: ignore
-        logger = logging.getLogger("sqlalchemy.engine")
-        level = logger.level
-
-        logger.setLevel(logging.WARNING)
-        result = func(*args, **kwargs)
-        logger.setLevel(level)
+        level = _sql_logger.level
 
-        return result
+        _sql_logger.setLevel(logging.WARNING)
+        try:
+            return func(*args, **kwargs)
+        finally:
+            _sql_logger.setLevel(level)
 
     return cast(F, inner)
 
@@ -43,28 +50,41 @@ def no_sql_log(func: F) -> F:
 class GarbageCollector(Thread):
     MAX_HOURS = 48  # maximum time during which a message can be deleted after
     # it's posted
+    MAX_DELETE_WORKERS = 8
+    MAX_IDLE_WAIT = 60  # maximum time to sleep when there's nothing to delete
+    DELETE_BATCH_SIZE = 100  # the Bot API limit for one deleteMessages call
+    SWEEP_BATCH_SIZE = 500  # bounds the transaction size of a single sweep
 
     def __init__(self, client: Client) -> None:
         super().__init__(daemon=True)
         self.client = client
         self.retries_queue: Queue[tuple[int, int | None]] = Queue()
+        self.delete_pool = ThreadPoolExecutor(max_workers=self.MAX_DELETE_WORKERS)
+        self._pending_records: list[dict] = []
+        self._pending_lock = Lock()
+        self._msg_insert = MessageRecord.__table__.insert()
+        self._wake = Event()
+        self._unreachable_ts = 0
+        self._unreachable = 0
 
     def enable(self, chat_id: int, ttl: int) -> None:
         logger.debug(
             "Enabling garbage collector for chat %s with ttl %ss", chat_id, ttl
         )
-        settings = get_settings(chat_id)
+        # The cached instance is detached; merge it into this thread's
+        # session before mutating.
+        settings = global_session.merge(get_settings(chat_id))
         settings.gc_enabled = True
         settings.gc_ttl = ttl
-        global_session.add(settings)
         global_session.commit()
+        invalidate_settings(chat_id)
 
     def disable(self, chat_id: int) -> None:
         logger.debug("Disabling garbage collector for chat %s", chat_id)
-        settings = get_settings(chat_id)
+        settings = global_session.merge(get_settings(chat_id))
         settings.gc_enabled = False
-        global_session.add(settings)
         global_session.commit()
+        invalidate_settings(chat_id)
 
     def cancel(self, chat_id: int) -> int:
         logger.debug("Cancelling removal of pending messages in chat %s", chat_id)
@@ -75,7 +95,10 @@ class GarbageCollector(Thread):
                 MessageRecord.deleted == False,
                 MessageRecord.should_delete == True,
             )
-            .update({"should_delete": False, "delete_cancelled": True})
+            .update(
+                {"should_delete": False, "delete_cancelled": True},
+                synchronize_session=False,
+            )
         )
 
         global_session.commit()
@@ -95,39 +118,99 @@ class GarbageCollector(Thread):
             delete_after = message.date + ttl
             should_delete = True
 
-        record = MessageRecord(
-            chat_id=message.chat.id,
-            message_id=message.message_id,
-            date=message.date,
-            delete_after=delete_after,
-            should_delete=should_delete,
-        )
-        global_session.add(record)
-        global_session.commit()
+        # Buffer a plain dict instead of committing an ORM object right
+        # away: one commit per message would make the polling thread wait on
+        # the database for every update, and the flush below doesn't need
+        # identity-map bookkeeping. The collector thread drains the buffer
+        # on its next tick with a single executemany INSERT.
+        record = {
+            "chat_id": message.chat.id,
+            "message_id": message.message_id,
+            "date": message.date,
+            "delete_after": delete_after,
+            "should_delete": should_delete,
+        }
+        with self._pending_lock:
+            self._pending_records.append(record)
+
+        self._wake.set()
+
+    def _flush_pending(self) -> None:
+        with self._pending_lock:
+            batch, self._pending_records = self._pending_records, []
+
+        if not batch:
+            return
+
+        self.thread_session.execute(self._msg_insert, batch)
+        self.thread_session.commit()
 
     def run(self) -> None:
         self.thread_session = Session()
         while True:
-            self.collect_garbage()
+            # A failed sweep (network error, dropped DB connection) must
+            # not kill the daemon thread - log it, reset the session and
+            # try again on the next wake-up.
+            timeout = float(self.MAX_IDLE_WAIT)
+            try:
+                self._flush_pending()
+                self.collect_garbage()
+                self._drain_retries()
+                timeout = self._next_wake_in()
+            except Exception:
+                logger.exception("Collector sweep failed")
+                self.thread_session.rollback()
+
+            # Sleep until the next message is due instead of polling at a
+            # fixed rate; add_message/retry wake the thread up early.
+            self._wake.wait(timeout=timeout)
+            self._wake.clear()
+
+    def _drain_retries(self) -> None:
+        # Process every queued retry before going back to sleep, so a
+        # second /retry isn't left waiting out the idle timeout.
+        while True:
             try:
-                retry_params = self.retries_queue.get(timeout=1)
+                chat_id, max_attempts = self.retries_queue.get_nowait()
             except Empty:
-                continue
-            chat_id, max_attempts = retry_params
+                return
             self._run_retry(chat_id, max_attempts)
 
-    @property
-    def unreachable_date(self) -> int:
-        date = datetime.now() - timedelta(hours=self.MAX_HOURS)
-        return int(date.timestamp())
-
-    def _delete_record(self, record: MessageRecord) -> None:
-        logger.debug(
-            "Deleting message %s from chat %s", record.message_id, record.chat_id
+    @no_sql_log
+    def _next_wake_in(self) -> float:
+        # Apply the same reachability cut-off as collect_garbage: a row the
+        # sweep will never touch must not produce a zero timeout, or the
+        # loop would busy-spin on it forever.
+        now = time.time()
+        next_due = (
+            self.thread_session.query(func.min(MessageRecord.delete_after))
+            .filter(
+                MessageRecord.deleted == False,
+                MessageRecord.should_delete == True,
+                MessageRecord.date > int(now) - self.MAX_HOURS * 3600,
+            )
+            .scalar()
         )
 
-        response = self.client.delete_message(record.chat_id, record.message_id)
+        if next_due is None:
+            return self.MAX_IDLE_WAIT
 
+        return max(0.0, min(float(self.MAX_IDLE_WAIT), next_due - now))
+
+    @property
+    def unreachable_date(self) -> int:
+        # Memoized at whole-second granularity: the query helpers read this
+        # several times in a row, and a value that's stable within a second
+        # also keeps the bind parameter consistent across related queries.
+        now = int(time.time())
+        if now != self._unreachable_ts:
+            self._unreachable_ts = now
+            self._unreachable = now - self.MAX_HOURS * 3600
+        return self._unreachable
+
+    def _record_delete_result(
+        self, record: MessageRecord, response: APIResponse
+    ) -> None:
         record.delete_attempt += 1
         if response.ok:
             record.deleted = True
@@ -142,30 +225,135 @@ class GarbageCollector(Thread):
             )
 
         self.thread_session.add(record)
+
+    def _delete_record(self, record: MessageRecord) -> None:
+        logger.debug(
+            "Deleting message %s from chat %s", record.message_id, record.chat_id
+        )
+
+        response = self.client.delete_message(record.chat_id, record.message_id)
+        self._record_delete_result(record, response)
         self.thread_session.commit()
 
     @no_sql_log
     def collect_garbage(self) -> None:
-        now = int(datetime.now().timestamp())
-        records = list(
-            self.thread_session.query(MessageRecord).filter(
+        # A single clock read per sweep: the cut-off dates are derived from
+        # it with integer math instead of allocating datetime objects.
+        now = int(time.time())
+        # Fetch plain tuples instead of full ORM objects: the sweep only
+        # needs the ids, and the results are applied with bulk UPDATEs below.
+        rows = (
+            self.thread_session.query(
+                MessageRecord.id, MessageRecord.chat_id, MessageRecord.message_id
+            )
+            .filter(
                 MessageRecord.delete_after <= now,
                 MessageRecord.deleted == False,
-                MessageRecord.date > self.unreachable_date,
+                MessageRecord.date > now - self.MAX_HOURS * 3600,
                 MessageRecord.should_delete == True,
             )
+            .order_by(MessageRecord.delete_after)
+            .limit(self.SWEEP_BATCH_SIZE)
+            .all()
         )
 
-        if record_ids := [r.message_id for r in records]:
-            logger.debug("Collected %s", record_ids)
+        if not rows:
+            return
+
+        # The id list is built eagerly, so only pay for it when DEBUG logging
+        # is actually on.
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Collected %s", [row.message_id for row in rows])
+
+        # Group the due messages by chat and delete them through the bulk
+        # deleteMessages endpoint, up to 100 ids per request; the chunks
+        # still go through the pool so chats don't serialize behind each
+        # other.
+        groups: dict[int, list[Any]] = defaultdict(list)
+        for row in rows:
+            groups[row.chat_id].append(row)
+
+        futures = []
+        for chat_id, chat_rows in groups.items():
+            for start in range(0, len(chat_rows), self.DELETE_BATCH_SIZE):
+                chunk = chat_rows[start : start + self.DELETE_BATCH_SIZE]
+                futures.append(
+                    self.delete_pool.submit(self._delete_chunk, chat_id, chunk)
+                )
+
+        deleted_ids, failed_ids = [], []
+        for future in futures:
+            # No result timeout: a chunk that falls back to per-message
+            # deletes can legitimately take minutes under throttling, and
+            # every HTTP call inside it has its own timeout, so the future
+            # always terminates.
+            chunk_deleted, chunk_failed = future.result()
+            deleted_ids.extend(chunk_deleted)
+            failed_ids.extend(chunk_failed)
+
+        if deleted_ids:
+            self._mark_deleted(deleted_ids)
+        if failed_ids:
+            self._mark_failed(failed_ids)
 
-        for record in records:
-            self._delete_record(record)
+        self.thread_session.commit()
+
+    def _delete_chunk(
+        self, chat_id: int, rows: list[Any]
+    ) -> tuple[list[int], list[int]]:
+        response = self.client.delete_messages(
+            chat_id, [row.message_id for row in rows]
+        )
+
+        if response.ok:
+            return [row.id for row in rows], []
+
+        # The batch call failed as a whole - fall back to deleting one by
+        # one so each record gets accurate bookkeeping.
+        deleted_ids, failed_ids = [], []
+        for row in rows:
+            response = self.client.delete_message(chat_id, row.message_id)
+            if response.ok:
+                deleted_ids.append(row.id)
+            else:
+                failed_ids.append(row.id)
+                logger.error(
+                    "Failed to delete message %s: %s",
+                    row.message_id,
+                    response,
+                )
+
+        return deleted_ids, failed_ids
+
+    def _mark_deleted(self, record_ids: list[int]) -> None:
+        self.thread_session.query(MessageRecord).filter(
+            MessageRecord.id.in_(record_ids)
+        ).update(
+            {
+                "deleted": True,
+                "delete_attempt": MessageRecord.delete_attempt + 1,
+            },
+            synchronize_session=False,
+        )
+
+    def _mark_failed(self, record_ids: list[int]) -> None:
+        self.thread_session.query(MessageRecord).filter(
+            MessageRecord.id.in_(record_ids)
+        ).update(
+            {
+                "deleted": False,
+                "should_delete": False,
+                "delete_failed": True,
+                "delete_attempt": MessageRecord.delete_attempt + 1,
+            },
+            synchronize_session=False,
+        )
 
     def retry(self, chat_id: int, max_attempts: int | None = None) -> None:
         # Not running retry process directly in order to not block bot's polling loop.
         # Instead, use a queue to execute retries in the collector's thread.
         self.retries_queue.put((chat_id, max_attempts))
+        self._wake.set()
 
     def _run_retry(self, chat_id: int, max_attempts: int | None = None) -> None:
         logger.debug("Re-trying to delete failed messages for chat %s", chat_id)
@@ -203,68 +391,56 @@ class GarbageCollector(Thread):
 
         return records
 
-    def count_pending(self, chat_id: int) -> int:
-        return (
-            global_session.query(MessageRecord)
-            .filter(
-                MessageRecord.chat_id == chat_id,
-                MessageRecord.date > self.unreachable_date,
-                MessageRecord.deleted == False,
-                MessageRecord.should_delete == True,
-            )
-            .count()
+    def _status_counts(
+        self, chat_id: int
+    ) -> tuple[int, int, int, int, int, int | None]:
+        # All of the status aggregates scan the same chat's rows, so fuse
+        # them into a single SUM(CASE)/MIN(CASE) query instead of issuing
+        # one round-trip per counter.
+        unreachable_date = self.unreachable_date
+        pending = and_(
+            MessageRecord.date > unreachable_date,
+            MessageRecord.deleted == False,
+            MessageRecord.should_delete == True,
         )
-
-    def count_unreachable(self, chat_id: int) -> int:
-        return (
-            global_session.query(MessageRecord)
-            .filter(
-                MessageRecord.chat_id == chat_id,
-                MessageRecord.date <= self.unreachable_date,
-                MessageRecord.deleted == False,
-            )
-            .count()
+        unreachable = and_(
+            MessageRecord.date <= unreachable_date,
+            MessageRecord.deleted == False,
         )
-
-    def count_cancelled(self, chat_id: int) -> int:
-        return (
-            global_session.query(MessageRecord)
-            .filter(
-                MessageRecord.chat_id == chat_id,
-                MessageRecord.date > self.unreachable_date,
-                MessageRecord.deleted == False,
-                MessageRecord.delete_cancelled == True,
-            )
-            .count()
+        cancelled = and_(
+            MessageRecord.date > unreachable_date,
+            MessageRecord.deleted == False,
+            MessageRecord.delete_cancelled == True,
         )
-
-    def count_deleted(self, chat_id: int) -> int:
-        return (
-            global_session.query(MessageRecord)
-            .filter(
-                MessageRecord.chat_id == chat_id,
-                MessageRecord.deleted == True,
-            )
-            .count()
+        failed = and_(
+            MessageRecord.date > unreachable_date,
+            MessageRecord.deleted == False,
+            MessageRecord.delete_failed == True,
         )
 
-    def next_delete_in(self, chat_id: int) -> timedelta | None:
-        next_record = (
-            global_session.query(MessageRecord)
-            .filter(
-                MessageRecord.chat_id == chat_id,
-                MessageRecord.date > self.unreachable_date,
-                MessageRecord.deleted == False,
-                MessageRecord.should_delete == True,
+        count = lambda cond: func.sum(case([(cond, 1)], else_=0))
+
+        row = (
+            global_session.query(
+                count(pending),
+                count(unreachable),
+                count(cancelled),
+                count(failed),
+                count(MessageRecord.deleted == True),
+                func.min(case([(pending, MessageRecord.delete_after)])),
             )
-            .order_by(MessageRecord.delete_after)
-            .first()
+            .filter(MessageRecord.chat_id == chat_id)
+            .one()
         )
 
-        if not next_record:
-            return None
-
-        return datetime.utcfromtimestamp(next_record.delete_after) - datetime.utcnow()
+        return (
+            row[0] or 0,
+            row[1] or 0,
+            row[2] or 0,
+            row[3] or 0,
+            row[4] or 0,
+            row[5],
+        )
 
     def _get_failed(
         self,
@@ -292,15 +468,27 @@ class GarbageCollector(Thread):
 
     def status(self, chat_id: int) -> dict[str, Any]:
         settings = get_settings(chat_id)
-        next_delete_in = self.next_delete_in(chat_id)
-        next_delete_str = format_interval(next_delete_in) if next_delete_in else "N/A"
+        (
+            pending,
+            unreachable,
+            cancelled,
+            failed,
+            deleted,
+            next_delete_after,
+        ) = self._status_counts(chat_id)
+
+        if next_delete_after is not None:
+            next_delete_str = format_interval(next_delete_after - int(time.time()))
+        else:
+            next_delete_str = "N/A"
+
         return {
             "gc_enabled": settings.gc_enabled,
             "gc_ttl": settings.gc_ttl,
-            "gc_pending_count": self.count_pending(chat_id),
-            "gc_unreachable_count": self.count_unreachable(chat_id),
-            "gc_cancelled_count": self.count_cancelled(chat_id),
-            "gc_failed_count": self.count_failed(chat_id),
-            "gc_deleted_count": self.count_deleted(chat_id),
+            "gc_pending_count": pending,
+            "gc_unreachable_count": unreachable,
+            "gc_cancelled_count": cancelled,
+            "gc_failed_count": failed,
+            "gc_deleted_count": deleted,
             "gc_next_delete_in": next_delete_str,
         }
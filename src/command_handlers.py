@@ -4,10 +4,15 @@ import json
 from logging import getLogger
 from typing import TYPE_CHECKING, Any, Type, cast
 
+try:
+    import orjson
+except ImportError:
+    orjson = None  # type: ignore[assignment]
+
 from client import Client
 from db import session
 from entities import CallbackQuery, Message
-from settings import get_settings
+from settings import get_settings, invalidate_settings
 from utils.formatting import format_interval
 from utils.keyboards import get_remove_keyboard, get_ttl_buttons
 from utils.table import Table
@@ -81,6 +86,15 @@ class GcHandler(CommandHandler):
     short_description = "Enable automatic removal of messages"
     validator_class = GcValidator
 
+    # The keyboard never changes, so build it once at class definition
+    # instead of reassembling the nested dicts on every /gc.
+    KEYBOARD = {
+        "keyboard": get_ttl_buttons("gc")
+        + [[{"text": "/gcoff - disable GC"}, {"text": "/noop - cancel"}]],
+        "one_time_keyboard": True,
+        "selective": True,
+    }
+
     def process(self, message: Message) -> None:
         command = message.command
         assert command
@@ -89,7 +103,7 @@ class GcHandler(CommandHandler):
             self.client.reply(
                 message,
                 "Please choose an expiration time for new messages",
-                reply_markup=self._get_keyboard(),
+                reply_markup=self.KEYBOARD,
             )
             return
 
@@ -105,19 +119,6 @@ class GcHandler(CommandHandler):
             reply_markup=get_remove_keyboard(),
         )
 
-    @staticmethod
-    def _get_keyboard() -> dict:
-        buttons = get_ttl_buttons("gc")
-        buttons.append(
-            [{"text": "/gcoff - disable GC"}, {"text": "/noop - cancel"}],
-        )
-
-        return {
-            "keyboard": buttons,
-            "one_time_keyboard": True,
-            "selective": True,
-        }
-
 
 class GcOffHandler(CommandHandler):
     command_str = "gcoff"
@@ -200,6 +201,13 @@ class FwdHandler(CommandHandler):
     short_description = "Enable automatic removal of forwards from channels."
     validator_class = FwdValidator
 
+    KEYBOARD = {
+        "keyboard": get_ttl_buttons("fwd")
+        + [[{"text": "/fwd 0"}, {"text": "/noop - cancel"}]],
+        "one_time_keyboard": True,
+        "selective": True,
+    }
+
     def process(self, message: Message) -> None:
         command = message.command
         assert command
@@ -208,16 +216,18 @@ class FwdHandler(CommandHandler):
             self.client.reply(
                 message,
                 "Please choose an expiration time for forwarded messages",
-                reply_markup=self._get_keyboard(),
+                reply_markup=self.KEYBOARD,
             )
             return
 
         ttl = command.params_clean[0]
 
-        settings = get_settings(message.chat.id)
+        # The cached instance is detached; merge it into this thread's
+        # session before mutating.
+        settings = session.merge(get_settings(message.chat.id))
         settings.forwards_ttl = ttl
-        session.add(settings)
         session.commit()
+        invalidate_settings(message.chat.id)
 
         logger.debug("Forwards removal enabled")
 
@@ -231,23 +241,10 @@ class FwdHandler(CommandHandler):
         else:
             self.client.reply(
                 message,
-                f"Automatic removal of forwarded messages disabled.",
+                "Automatic removal of forwarded messages disabled.",
                 reply_markup=get_remove_keyboard(),
             )
 
-    @staticmethod
-    def _get_keyboard() -> dict[str, Any]:
-        buttons = get_ttl_buttons("fwd")
-        buttons.append(
-            [{"text": "/fwd 0"}, {"text": "/noop - cancel"}],
-        )
-
-        return {
-            "keyboard": buttons,
-            "one_time_keyboard": True,
-            "selective": True,
-        }
-
 
 class StatusHandler(CommandHandler):
     command_str = "status"
@@ -265,7 +262,11 @@ class StatusHandler(CommandHandler):
 
     @staticmethod
     def _format_status(status: dict[str, Any]) -> str:
-        return json.dumps(status, indent=4)
+        # stdlib json is at its slowest on the indented path; prefer orjson
+        # when it's available, matching the client module.
+        if orjson is not None:
+            return orjson.dumps(status, option=orjson.OPT_INDENT_2).decode()
+        return json.dumps(status, indent=2)
 
 
 class PingHandler(CommandHandler):
@@ -273,7 +274,7 @@ class PingHandler(CommandHandler):
     short_description = 'Sends "pong" in response.'
 
     def process(self, message: Message) -> None:
-        self.client.reply(message, f"pong")
+        self.client.reply(message, "pong")
 
 
 class GithubHandler(CommandHandler):
@@ -283,7 +284,7 @@ class GithubHandler(CommandHandler):
     def process(self, message: Message) -> None:
         self.client.reply(
             message,
-            f"https://github.com/longedok/gcbot",
+            "https://github.com/longedok/gcbot",
             disable_web_page_preview=True,
         )
 
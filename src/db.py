@@ -2,7 +2,16 @@ from __future__ import annotations
 
 import os
 
-from sqlalchemy import BigInteger, Boolean, Column, DateTime, Integer, create_engine
+from sqlalchemy import (
+    BigInteger,
+    Boolean,
+    Column,
+    DateTime,
+    Index,
+    Integer,
+    create_engine,
+    text,
+)
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import scoped_session, sessionmaker
 
@@ -10,17 +19,46 @@ pg_user = os.environ["POSTGRES_USERNAME"]
 pg_pass = os.environ["POSTGRES_PASSWORD"]
 pg_db = os.environ["POSTGRES_DB"]
 pg_host = os.environ.get("POSTGRES_HOST", "postgres")
-engine = create_engine(f"postgresql://{pg_user}:{pg_pass}@{pg_host}/{pg_db}")
+engine = create_engine(
+    f"postgresql://{pg_user}:{pg_pass}@{pg_host}/{pg_db}",
+    # The bot, worker and collector threads plus the delete pool all draw
+    # from this pool; pre-ping drops stale connections after Postgres
+    # restarts instead of surfacing them as errors mid-sweep.
+    pool_pre_ping=True,
+    pool_size=10,
+    max_overflow=20,
+)
 
 session_factory = sessionmaker(bind=engine)
 Session = scoped_session(session_factory)
-session = Session()
+# The scoped_session registry is a proxy that resolves to a per-thread
+# session on every use. Exposing the proxy itself (rather than the session
+# of whichever thread imported this module first) keeps the bot thread and
+# the collector thread from sharing one connection.
+session = Session
 
 Base = declarative_base()
 
 
 class MessageRecord(Base):
     __tablename__ = "messages"
+    __table_args__ = (
+        # Covers the per-chat filters in cancel/count_*/get_removal_queue.
+        Index("ix_messages_gc", "chat_id", "deleted", "should_delete", "date"),
+        # For per-chat date-range scans that don't filter on the flags,
+        # e.g. the fused /status aggregation.
+        Index("ix_messages_chat_date", "chat_id", "date"),
+        # Covers the collector's periodic sweep for due messages.
+        Index("ix_messages_sweep", "deleted", "should_delete", "delete_after"),
+        # Partial index for the sweep and next-wake-up queries: only the
+        # small set of still-pending rows is indexed, so lookups stay cheap
+        # no matter how much deleted history the table accumulates.
+        Index(
+            "ix_messages_pending",
+            "delete_after",
+            postgresql_where=text("should_delete AND NOT deleted"),
+        ),
+    )
 
     id = Column(Integer, primary_key=True)
     message_id = Column(Integer, nullable=False)
@@ -44,7 +82,7 @@ class Settings(Base):
     __tablename__ = "settings"
 
     id = Column(Integer, primary_key=True)
-    chat_id = Column(BigInteger, nullable=False)
+    chat_id = Column(BigInteger, nullable=False, unique=True)
     gc_enabled = Column(Boolean, default=False)
     gc_ttl = Column(Integer, default=0)
     forwards_ttl = Column(Integer, default=0)
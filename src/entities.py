@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import json
 import logging
+import re
 from dataclasses import dataclass, field
 from functools import cached_property
 from typing import TYPE_CHECKING, Any, ClassVar, Type
@@ -10,6 +11,8 @@ import pytimeparse
 
 logger = logging.getLogger(__name__)
 
+_COMMAND_RE = re.compile(r"/(\w+)(?:@(\w+))?")
+
 
 @dataclass
 class Command:
@@ -76,37 +79,51 @@ class Message:
 
     @classmethod
     def from_json(cls, message_json: dict) -> Message:
-        text = message_json.get("text")
+        get = message_json.get
+        text = get("text")
         message_id = message_json["message_id"]
         chat = Chat.from_json(message_json["chat"])
         date = message_json["date"]
 
-        entities_json = message_json.get("entities", [])
+        entities_json = get("entities")
         if entities_json:
             entities = [Entity.from_json(entity) for entity in entities_json]
         else:
             entities = []
 
-        forward_from_chat = None
-        if "forward_from_chat" in message_json:
-            forward_from_chat = ForwardFromChat.from_json(
-                message_json["forward_from_chat"]
-            )
+        # A single .get instead of a membership test plus a lookup.
+        forward_from_chat_json = get("forward_from_chat")
+        if forward_from_chat_json:
+            forward_from_chat = ForwardFromChat.from_json(forward_from_chat_json)
+        else:
+            forward_from_chat = None
 
         return cls(text, message_id, chat, date, entities, forward_from_chat)
 
     @cached_property
     def command(self) -> Command | None:
-        entities = self.get_entities_by_type("bot_command")
-        entity = next(iter(entities), None)
+        # Most messages carry no entities at all, and only the first
+        # bot_command matters - scan lazily instead of building a list.
+        if not self.entities:
+            return None
+
+        entity = next(
+            (e for e in self.entities if e.type == "bot_command"), None
+        )
 
         if not entity:
             return None
 
         assert self.text
 
-        command_str = self.get_entity_text(entity).lower()
-        command_str, _, username = command_str.partition("@")
+        # One C-level regex match instead of slicing, lowercasing and
+        # partitioning the entity text through several interim strings.
+        match = _COMMAND_RE.match(self.text, entity.offset)
+        if not match:
+            return None
+
+        command_str = match.group(1).lower()
+        username = (match.group(2) or "").lower()
 
         params_str = self.text[entity.offset + entity.length + 1 :]
         params = params_str.split() if params_str else []
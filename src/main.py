@@ -9,20 +9,24 @@ from bot import Bot
 from client import Client
 from collector import GarbageCollector
 from db import init_storage
+from settings import preload_settings
 from utils.logging import CustomFormatter
 
 
 def init_logging() -> None:
+    env = os.environ.get("ENVIRONMENT", "dev")
+    default_level = "DEBUG" if env == "dev" else "INFO"
+    level = os.environ.get("LOG_LEVEL", default_level).upper()
+
     logging.basicConfig(
         format="%(asctime)s %(levelname)-5s %(name)-16s > %(message)s",
-        level=logging.DEBUG,
+        level=level,
     )
 
     logger = logging.getLogger()
     for handler in logger.root.handlers:  # type: ignore
         handler.setFormatter(CustomFormatter(handler.formatter._fmt))
 
-    env = os.environ.get("ENVIRONMENT", "dev")
     if env == "dev":
         logging.getLogger("sqlalchemy.engine").setLevel(logging.INFO)
 
@@ -30,6 +34,7 @@ def init_logging() -> None:
 def main() -> None:
     init_logging()
     init_storage()
+    preload_settings()
 
     client = Client()
 
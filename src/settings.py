@@ -1,12 +1,24 @@
 from __future__ import annotations
 
-from functools import cache
+from collections import OrderedDict
+
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 
 from db import Settings, session
 
+# Bounded LRU rather than a bare dict: the bot can be added to an unbounded
+# number of chats over a long uptime, and each cached row pins an ORM
+# instance in memory.
+_CACHE_MAX = 1024
+_settings_cache: OrderedDict[int, Settings] = OrderedDict()
+
 
-@cache
 def get_settings(chat_id: int) -> Settings:
+    settings = _settings_cache.get(chat_id)
+    if settings is not None:
+        _settings_cache.move_to_end(chat_id)
+        return settings
+
     settings = (
         session.query(Settings)
         .filter(
@@ -16,8 +28,45 @@ def get_settings(chat_id: int) -> Settings:
     )
 
     if not settings:
-        settings = Settings(chat_id=chat_id)
-        session.add(settings)
+        # INSERT ... ON CONFLICT DO NOTHING instead of a plain INSERT: the
+        # bot and collector threads can both see a new chat at the same
+        # time, and only one of them should create the row.
+        session.execute(
+            pg_insert(Settings.__table__)
+            .values(chat_id=chat_id)
+            .on_conflict_do_nothing(index_elements=["chat_id"])
+        )
         session.commit()
+        settings = (
+            session.query(Settings)
+            .filter(
+                Settings.chat_id == chat_id,
+            )
+            .one()
+        )
+
+    _cache_detached(settings)
 
     return settings
+
+
+def _cache_detached(settings: Settings) -> None:
+    # Detach the instance before caching it: the cache is shared between
+    # the bot and collector threads, and an instance still attached to one
+    # thread's scoped session can't be add()ed or refreshed from another.
+    # Writers merge() the cached copy into their own session first.
+    session.expunge(settings)
+    _settings_cache[settings.chat_id] = settings
+    if len(_settings_cache) > _CACHE_MAX:
+        _settings_cache.popitem(last=False)
+
+
+def preload_settings() -> None:
+    # Warm the cache with one full-table scan at startup, so the first
+    # message from each known chat doesn't pay a SELECT round-trip.
+    for settings in session.query(Settings).limit(_CACHE_MAX).all():
+        _cache_detached(settings)
+
+
+def invalidate_settings(chat_id: int) -> None:
+    _settings_cache.pop(chat_id, None)
@@ -1,12 +1,13 @@
 from __future__ import annotations
 
-from typing import TYPE_CHECKING
+from datetime import timedelta
+from typing import Union
 
-if TYPE_CHECKING:
-    from datetime import timedelta
 
+def format_interval(interval: Union[timedelta, int]) -> str:
+    if not isinstance(interval, timedelta):
+        interval = timedelta(seconds=interval)
 
-def format_interval(interval: timedelta) -> str:
     uptime_str = str(interval)
     time_str, _, _ = uptime_str.partition(".")
     return time_str
@@ -1,5 +1,12 @@
 from typing import Any
 
+# Built once at import: the keyboards never change, so handlers can reuse
+# the same dicts instead of reallocating them on every command.
+REMOVE_KEYBOARD: dict[str, Any] = {
+    "remove_keyboard": True,
+    "selective": True,
+}
+
 
 def get_ttl_buttons(command: str) -> list[list[dict]]:
     return [
@@ -10,7 +17,4 @@ def get_ttl_buttons(command: str) -> list[list[dict]]:
 
 
 def get_remove_keyboard() -> dict[str, Any]:
-    return {
-        "remove_keyboard": True,
-        "selective": True,
-    }
+    return REMOVE_KEYBOARD
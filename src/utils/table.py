@@ -1,10 +1,8 @@
 from __future__ import annotations
 
-import json
-import math
-from datetime import datetime
+import time
 from functools import cached_property
-from typing import TYPE_CHECKING, Iterable, cast
+from typing import TYPE_CHECKING, Iterable, Iterator, cast
 
 from .formatting import format_interval
 
@@ -27,7 +25,8 @@ class Table:
 
     @cached_property
     def num_pages(self) -> int:
-        return math.ceil(self.total / self.PAGE_SIZE)
+        # Ceiling division in pure int arithmetic.
+        return -(-self.total // self.PAGE_SIZE)
 
     def build(self) -> str:
         if not self.total:
@@ -37,8 +36,7 @@ class Table:
         records = self.records.offset(offset).limit(self.PAGE_SIZE)
 
         table = self.get_title()
-        rows = self.get_rows(records, offset)
-        table += "\n".join(rows)
+        table += "\n".join(self.get_rows(records, offset))
         table += f"\n\n[page <b>{self.page}</b> out of <b>{self.num_pages}</b>]"
 
         return table
@@ -46,16 +44,14 @@ class Table:
     def get_title(self) -> str:
         return f"Message IDs to be deleted next (<b>{self.total}</b> in total):\n\n"
 
-    def get_rows(self, records: Iterable[MessageRecord], offset: int) -> list[str]:
-        rows = []
-        utc_now = datetime.utcnow()
+    def get_rows(self, records: Iterable[MessageRecord], offset: int) -> Iterator[str]:
+        # delete_after is already a unix timestamp - subtract ints instead
+        # of allocating two datetime objects per row. Yielding rows lets
+        # build() join them without an intermediate list.
+        now = int(time.time())
         for i, record in enumerate(records):
-            delete_in = format_interval(
-                datetime.utcfromtimestamp(record.delete_after or 0) - utc_now
-            )
-            row_number = offset + i + 1
-            rows.append(f"{row_number}. <b>{record.message_id}</b> in {delete_in}")
-        return rows
+            delete_in = format_interval((record.delete_after or 0) - now)
+            yield f"{offset + i + 1}. <b>{record.message_id}</b> in {delete_in}"
 
     def get_empty_message(self) -> str:
         return "No messages queued for removal."
@@ -63,7 +59,9 @@ class Table:
     def _get_keyboard(self) -> list[list[dict]]:
         keyboard: list[list[dict]] = [[]]
 
-        format_data = lambda page: json.dumps({"page": page, "type": "queue"})
+        # The payload shape is fixed, so format it directly instead of
+        # building a dict and running it through json.dumps per button.
+        format_data = lambda page: f'{{"page": {page}, "type": "queue"}}'
 
         if self.page > 1:
             keyboard[0].append(
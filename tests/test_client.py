@@ -47,3 +47,18 @@ class TestClient:
         requests_mock.get(f"{BASE_URL}/getUpdates", exc=Timeout)
         updates = client.get_updates()
         assert updates == []
+
+    def test_delete_messages(self, client, requests_mock):
+        requests_mock.post(
+            f"{BASE_URL}/deleteMessages",
+            json={
+                "ok": True,
+                "result": True,
+            },
+        )
+        response = client.delete_messages(CHAT_ID, [125, 126, 127])
+
+        assert response.ok
+        body = requests_mock.last_request.json()
+        assert body["chat_id"] == CHAT_ID
+        assert body["message_ids"] == [125, 126, 127]
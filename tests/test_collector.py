@@ -0,0 +1,47 @@
+from unittest.mock import Mock
+
+import pytest
+
+from collector import GarbageCollector
+
+CHAT_ID = -593555199
+
+
+class FakeRow:
+    def __init__(self, id, message_id):
+        self.id = id
+        self.message_id = message_id
+
+
+class TestDeleteChunk:
+    @pytest.fixture
+    def collector(self):
+        return GarbageCollector(Mock())
+
+    @pytest.fixture
+    def rows(self):
+        return [FakeRow(1, 125), FakeRow(2, 126), FakeRow(3, 127)]
+
+    def test_bulk_delete(self, collector, rows):
+        collector.client.delete_messages = Mock(return_value=Mock(ok=True))
+
+        deleted_ids, failed_ids = collector._delete_chunk(CHAT_ID, rows)
+
+        assert deleted_ids == [1, 2, 3]
+        assert failed_ids == []
+        collector.client.delete_messages.assert_called_once_with(
+            CHAT_ID, [125, 126, 127]
+        )
+        collector.client.delete_message.assert_not_called()
+
+    def test_fallback_on_bulk_failure(self, collector, rows):
+        collector.client.delete_messages = Mock(return_value=Mock(ok=False))
+        collector.client.delete_message = Mock(
+            side_effect=[Mock(ok=True), Mock(ok=False), Mock(ok=True)]
+        )
+
+        deleted_ids, failed_ids = collector._delete_chunk(CHAT_ID, rows)
+
+        assert deleted_ids == [1, 3]
+        assert failed_ids == [2]
+        assert collector.client.delete_message.call_count == 3